@@ -1,14 +1,26 @@
 import argparse
+import atexit
+import ctypes
+import functools
 import json
 import logging
 import os
+import platform
 import random
+import threading
 import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 from hashlib import sha256
-from multiprocessing import Pool, cpu_count
+from multiprocessing import Event, Pool, Value, cpu_count
 from tqdm import tqdm
 from flask import Flask, jsonify, request
 
+try:
+    import orjson
+except ImportError:  # orjson has no PyPy build; fall back to the stdlib encoder
+    orjson = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -20,9 +32,13 @@ DIFFICULTIES = {
 
 # Blockchain and Mining Configuration
 CHAIN = []
+MINING_TIMES = array('d')  # mining_time of each block in CHAIN, kept as a flat array for retargeting
 REWARD = 50  # Initial mining reward
 HALVING_INTERVAL = 210000  # Number of blocks between reward halving
 TARGET_TIME = 10 * 60  # Target time for mining a block (10 minutes)
+SCAN_CHUNK = 2 ** 20  # Nonces a compiled scanner checks between polls of the stop event
+HASHLIB_CHUNK = 2 ** 16  # Nonces the hashlib loop checks between polls of the stop event
+NO_NONCE = 2 ** 64 - 1  # Sentinel for "no nonce found" in shared memory
 
 # Flask Web Server for Monitoring
 app = Flask(__name__)
@@ -32,16 +48,31 @@ mining_info = {
     "difficulty": "Medium",
     "hash_rate": 0,
     "mining_time": 0,
+    "last_block": None,
+    "error": None,
 }
 
-def SHA256(text):
-    return sha256(text.encode("ascii")).hexdigest()
+# /mine hands blocks to a single background thread, which drives the mining processes.
+MINING_EXECUTOR = ThreadPoolExecutor(max_workers=1)
+MINING_LOCK = threading.Lock()
+
+# Worker pool reused across mine() calls (see get_pool), and the shared objects its workers report through.
+_POOL = None
+_POOL_SIZE = None
+_STOP = None  # Set once a worker finds a nonce, telling the others to stop
+_FOUND_NONCE = None  # The winning nonce, or NO_NONCE
+_HASHES_DONE = None  # Nonces hashed so far, across all workers
 
 def to_string(data):
     """
     Converts block data dictionary to a JSON string for hashing.
+
+    Keys are sorted, except for the nonce, which is always serialized last so that everything before it stays
+    constant while mining.
     """
-    return json.dumps(data, sort_keys=True)
+    fields = {key: value for key, value in data.items() if key != 'nonce'}
+    head = json.dumps(fields, sort_keys=True)[:-1] + (', ' if fields else '')
+    return f'{head}"nonce": {json.dumps(data["nonce"])}}}'
 
 def calculate_target(difficulty):
     """
@@ -49,17 +80,224 @@ def calculate_target(difficulty):
     """
     return 2 ** (256 - difficulty)
 
+def load_native_scanner():
+    """
+    Loads the native SHA-256 nonce scanner built from sha256_scan.c.
+
+    Returns None if the shared library hasn't been built.
+    """
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "libsha256_scan.so")
+    try:
+        sha256_scan = ctypes.CDLL(path).sha256_scan
+    except OSError:
+        return None
+    sha256_scan.argtypes = [
+        ctypes.c_char_p, ctypes.c_size_t,  # prefix
+        ctypes.c_char_p, ctypes.c_size_t,  # suffix
+        ctypes.c_uint64, ctypes.c_uint64,  # nonce range
+        ctypes.c_uint64,  # top 64 bits of the largest winning digest
+        ctypes.POINTER(ctypes.c_uint64),  # candidate nonce
+    ]
+    sha256_scan.restype = ctypes.c_int
+
+    def scan(prefix, suffix, nonce_start, nonce_end, target_hi):
+        found = ctypes.c_uint64()
+        status = sha256_scan(prefix, len(prefix), suffix, len(suffix), nonce_start, nonce_end, target_hi, ctypes.byref(found))
+        if status < 0:
+            raise MemoryError("sha256_scan could not allocate its message buffers")
+        return found.value if status else None
+
+    return scan
+
+def load_numba_scanner():
+    """
+    Loads the numba-compiled SHA-256 nonce scanner from sha256_numba.py.
+
+    Returns None if numba isn't installed, or under PyPy, whose JIT compiles the hashlib loop instead.
+    """
+    if platform.python_implementation() == "PyPy":
+        return None
+    try:
+        import numpy as np
+        import sha256_numba
+    except ImportError:
+        return None
+
+    def scan(prefix, suffix, nonce_start, nonce_end, target_hi):
+        nonce = sha256_numba.scan(np.frombuffer(prefix, dtype=np.uint8), np.frombuffer(suffix, dtype=np.uint8),
+                                  nonce_start, nonce_end, np.uint64(target_hi))
+        return nonce if nonce >= 0 else None
+
+    # Compile (or load from numba's cache) now, so forked workers inherit the machine code.
+    scan(b"", b"", 0, 0, 0)
+    return scan
+
+def load_gpu_scanner():
+    """
+    Loads the CUDA SHA-256 nonce scanner from sha256_cuda.py.
+
+    Returns None if CuPy isn't installed, there is no CUDA device, or the kernel disagrees with hashlib on a few
+    small nonce ranges.
+    """
+    try:
+        import sha256_cuda
+    except ImportError:
+        return None
+    if not sha256_cuda.available():
+        return None
+    if not sha256_cuda.self_check():
+        logging.warning("CUDA scanner disagrees with hashlib, mining on the CPU instead")
+        return None
+    return sha256_cuda.scan
+
+# Compiled CPU scanners, in order of preference. When neither is available, workers fall back to hashlib.
+SCANNER = load_native_scanner() or load_numba_scanner()
+GPU_SCANNER = load_gpu_scanner()
+
+def split_template(block_data):
+    """
+    Serializes the block once and splits it around the nonce value, so mining only has to splice in the nonce
+    digits: the hashed bytes are prefix + str(nonce) + suffix.
+    """
+    template = to_string({**block_data, "nonce": 0}).encode("ascii")
+    prefix, _, suffix = template.rpartition(b'"nonce": 0')
+    return prefix + b'"nonce": ', suffix
+
+def count_hashes(hashes_done, count):
+    """
+    Adds `count` to the shared hash counter, if there is one.
+    """
+    if hashes_done is not None:
+        with hashes_done.get_lock():
+            hashes_done.value += count
+
+def scan_candidates(scanner, prefix, suffix, nonce_start, nonce_end, target_hi, max_digest, stop=None, hashes_done=None):
+    """
+    Searches a nonce range with a compiled scanner and returns the winning nonce, or None.
+
+    The scanner only compares the top 64 bits of each digest against `target_hi`, so the candidates it
+    reports are checked against `max_digest` here before being accepted. With a `stop` event, the range is
+    scanned in chunks so that it can be polled and `hashes_done` updated in between; without one, the scanner
+    gets the whole range in a single call.
+    """
+    chunk_size = SCAN_CHUNK if stop is not None else max(nonce_end - nonce_start, 1)
+    # Hot path, no logging: workers only report through `stop` and `hashes_done`.
+    for chunk_start in range(nonce_start, nonce_end, chunk_size):
+        if stop is not None and stop.is_set():
+            return None
+        chunk_end = min(chunk_start + chunk_size, nonce_end)
+        nonce = chunk_start
+        while nonce < chunk_end:
+            nonce = scanner(prefix, suffix, nonce, chunk_end, target_hi)
+            if nonce is None:
+                break
+            if sha256(prefix + str(nonce).encode() + suffix).digest() <= max_digest:
+                count_hashes(hashes_done, nonce + 1 - chunk_start)
+                return nonce
+            nonce += 1
+        count_hashes(hashes_done, chunk_end - chunk_start)
+    return None
+
+HASHLIB_SCAN_SOURCE = """
+def scan(copy, nonce_start, nonce_end):
+    for nonce in range(nonce_start, nonce_end):
+        h = copy()
+        h.update({tail_format!r} % nonce)
+        if h.digest() <= {max_digest!r}:
+            return nonce
+    return None
+"""
+
+@functools.lru_cache(maxsize=None)
+def hashlib_scanner(suffix, max_digest):
+    """
+    Generates the hashlib scan loop for one block template and target.
+
+    scan(copy, nonce_start, nonce_end) hashes copy() + str(nonce) + suffix for each nonce and returns the first
+    one whose digest is <= max_digest, or None. The suffix is folded into the nonce format string and
+    max_digest into the comparison as literals. Equal-length bytes compare like big-endian integers, so the
+    digest never has to be converted to an int, and the comparison usually stops at the first byte.
+    """
+    namespace = {}
+    exec(HASHLIB_SCAN_SOURCE.format(tail_format=b'%d' + suffix.replace(b'%', b'%%'), max_digest=max_digest), namespace)
+    return namespace['scan']
+
+def init_worker(stop, found_nonce, hashes_done):
+    """
+    Pool initializer: hands each worker the shared objects it reports through. They have to be inherited
+    this way, since synchronization primitives can't be pickled into tasks.
+    """
+    global _STOP, _FOUND_NONCE, _HASHES_DONE
+    _STOP, _FOUND_NONCE, _HASHES_DONE = stop, found_nonce, hashes_done
+
+def get_pool(num_workers):
+    """
+    Returns the module-level worker pool, (re)creating it only when the requested size changes, so that
+    workers are started once instead of on every mine() call.
+    """
+    global _POOL, _POOL_SIZE, _STOP, _FOUND_NONCE, _HASHES_DONE
+    if _POOL is None or _POOL_SIZE != num_workers:
+        shutdown_pool()
+        _STOP, _FOUND_NONCE, _HASHES_DONE = Event(), Value('Q', NO_NONCE), Value('Q', 0)
+        _POOL = Pool(num_workers, initializer=init_worker, initargs=(_STOP, _FOUND_NONCE, _HASHES_DONE))
+        _POOL_SIZE = num_workers
+    return _POOL
+
+def shutdown_pool():
+    """
+    Terminates the module-level worker pool, if one is running.
+    """
+    global _POOL
+    if _POOL is not None:
+        _POOL.terminate()
+        _POOL = None
+
+atexit.register(shutdown_pool)
+
 def mine_nonce(args):
-    block_data, nonce_start, nonce_end, target, queue = args
-    for nonce in tqdm(range(nonce_start, nonce_end), desc="Mining", position=queue):
-        block_data['nonce'] = nonce
-        text = to_string(block_data)
-        new_hash = SHA256(text)
-        if int(new_hash, 16) < target:
-            block_data['hash'] = new_hash
-            return block_data
+    """
+    Searches a nonce range for a hash below the target and returns the winning nonce, or None.
+
+    Works on the serialized block template from split_template() and the target bounds precomputed by mine(),
+    rather than the block and target themselves. Returns early with None once the shared stop event is set by
+    another worker. Progress is added to the shared hash counter once per chunk rather than reported per nonce.
+    """
+    prefix, suffix, nonce_start, nonce_end, target_hi, max_digest = args
+
+    if SCANNER is not None:
+        return scan_candidates(SCANNER, prefix, suffix, nonce_start, nonce_end, target_hi, max_digest, _STOP, _HASHES_DONE)
+
+    # The nonce is serialized last, so the hash state over the prefix
+    # (the "midstate") can be computed once and copied for every nonce.
+    midstate = sha256(prefix)
+
+    # Generated in the worker, since exec'd functions can't be pickled to it.
+    scan = hashlib_scanner(suffix, max_digest)
+
+    # Hot path, no logging: workers only report through _STOP and _HASHES_DONE.
+    for chunk_start in range(nonce_start, nonce_end, HASHLIB_CHUNK):
+        if _STOP.is_set():
+            return None
+        chunk_end = min(chunk_start + HASHLIB_CHUNK, nonce_end)
+        nonce = scan(midstate.copy, chunk_start, chunk_end)
+        if nonce is not None:
+            count_hashes(_HASHES_DONE, nonce + 1 - chunk_start)
+            return nonce
+        count_hashes(_HASHES_DONE, chunk_end - chunk_start)
     return None
 
+def mining_worker(args):
+    """
+    Pool task: runs mine_nonce and, if this worker is the first to find a nonce, publishes it and sets the
+    stop event so the other workers exit.
+    """
+    nonce = mine_nonce(args)
+    if nonce is not None:
+        with _FOUND_NONCE.get_lock():
+            if not _STOP.is_set():
+                _FOUND_NONCE.value = nonce
+                _STOP.set()
+
 def mine(block_data, target_difficulty, num_workers=None):
     """
     Simulates mining a block with a specific difficulty.
@@ -67,35 +305,62 @@ def mine(block_data, target_difficulty, num_workers=None):
     Args:
         block_data: A dictionary containing block data like block number, transactions, and previous hash.
         target_difficulty: The target difficulty level (number of leading zeros required in the hash).
-        num_workers: Number of parallel processes to use for mining.
+        num_workers: Number of parallel processes to use for mining. Ignored when mining on the GPU.
 
     Returns:
         A dictionary containing the mined block data (including the mined hash) or None if not found within limit.
     """
-    if num_workers is None:
-        num_workers = cpu_count()
-
     target = calculate_target(target_difficulty)
     max_nonce = 2 ** 32  # Reasonable limit for a nonce
-    nonce_step = max_nonce // num_workers
+    prefix, suffix = split_template(block_data)
 
-    pool = Pool(num_workers)
-    args = [(block_data.copy(), i * nonce_step, (i + 1) * nonce_step, target, i) for i in range(num_workers)]
-    start_time = time.time()
-    results = pool.map(mine_nonce, args)
+    # A digest wins if it is below the target, i.e. at most target - 1. Workers compare raw digests against
+    # that bound as 32 big-endian bytes, and the compiled scanners prefilter on its top 64 bits.
+    max_digest = (target - 1).to_bytes(32, 'big')
+    target_hi = (target - 1) >> 192
 
-    pool.close()
-    pool.join()
+    if GPU_SCANNER is not None:
+        start_time = time.time()
+        nonce = scan_candidates(GPU_SCANNER, prefix, suffix, 0, max_nonce, target_hi, max_digest)
+        hashes = max_nonce if nonce is None else nonce + 1
+    else:
+        if num_workers is None:
+            num_workers = cpu_count()
+        nonce_step = max_nonce // num_workers
+
+        pool = get_pool(num_workers)
+        _STOP.clear()
+        _FOUND_NONCE.value = NO_NONCE
+        _HASHES_DONE.value = 0
+
+        args = [(prefix, suffix, i * nonce_step, (i + 1) * nonce_step, target_hi, max_digest) for i in range(num_workers)]
+        start_time = time.time()
+        results = pool.map_async(mining_worker, args)
+
+        # Wait until a worker finds a nonce or they have all exhausted their ranges,
+        # reporting the progress the workers have published in the meantime.
+        with tqdm(total=max_nonce, desc="Mining", unit="H", unit_scale=True) as progress:
+            while not _STOP.wait(0.5):
+                progress.update(_HASHES_DONE.value - progress.n)
+                mining_info["hash_rate"] = _HASHES_DONE.value / (time.time() - start_time)
+                if results.ready():
+                    break
+            _STOP.set()
+            results.get()
+            progress.update(_HASHES_DONE.value - progress.n)
+
+        nonce = _FOUND_NONCE.value if _FOUND_NONCE.value != NO_NONCE else None
+        hashes = _HASHES_DONE.value
 
     elapsed_time = time.time() - start_time
-    hash_rate = max_nonce / elapsed_time
+    hash_rate = hashes / elapsed_time
     mining_info["hash_rate"] = hash_rate
     logging.info(f"Hash rate: {hash_rate:.2f} hashes/second")
 
-    for result in results:
-        if result:
-            mining_info["mining_time"] = elapsed_time
-            return result
+    if nonce is not None:
+        mining_info["mining_time"] = elapsed_time
+        digest = sha256(prefix + str(nonce).encode() + suffix).digest()
+        return {**block_data, "nonce": nonce, "hash": digest.hex()}
 
     return None
 
@@ -117,15 +382,22 @@ def load_block_data(config_file):
     """
     Loads block data from a configuration file.
     """
-    with open(config_file, 'r') as file:
-        return json.load(file)
+    if orjson is None:
+        with open(config_file, 'r') as file:
+            return json.load(file)
+    with open(config_file, 'rb') as file:
+        return orjson.loads(file.read())
 
 def save_block_data(block_data, save_file):
     """
     Saves mined block data to a file.
     """
-    with open(save_file, 'w') as file:
-        json.dump(block_data, file, indent=4)
+    if orjson is None:
+        with open(save_file, 'w') as file:
+            json.dump(block_data, file, indent=2)
+    else:
+        with open(save_file, 'wb') as file:
+            file.write(orjson.dumps(block_data, option=orjson.OPT_INDENT_2))
     logging.info(f"Mined block saved to {save_file}")
 
 def adjust_difficulty(start_time, target_time):
@@ -144,6 +416,7 @@ def add_block_to_chain(block):
     Adds a mined block to the blockchain.
     """
     CHAIN.append(block)
+    MINING_TIMES.append(block['mining_time'])
     logging.info(f"Block {block['block_number']} added to the blockchain.")
 
 def retarget_difficulty():
@@ -151,7 +424,7 @@ def retarget_difficulty():
     Retargets the difficulty based on the average mining time of the last set of blocks.
     """
     if len(CHAIN) > 1 and len(CHAIN) % 10 == 0:  # Example: adjust every 10 blocks
-        avg_time = sum(block['mining_time'] for block in CHAIN[-10:]) / 10
+        avg_time = sum(MINING_TIMES[-10:]) / 10
         if avg_time < TARGET_TIME:
             return 1  # Increase difficulty
         elif avg_time > TARGET_TIME:
@@ -165,19 +438,74 @@ def status():
     """
     return jsonify(mining_info)
 
+def mine_next_block(block_data, target_difficulty, num_workers):
+    """
+    Mines a block submitted through /mine and appends it to the chain. Runs on MINING_EXECUTOR, so the web
+    server keeps answering requests while the workers search.
+    """
+    global REWARD  # Declare global REWARD at the beginning of the function
+
+    try:
+        start_time = time.time()
+        mined_block = mine(block_data, target_difficulty, num_workers)
+
+        if mined_block:
+            total_time = time.time() - start_time
+            mined_block['mining_time'] = total_time
+            mined_block['reward'] = REWARD
+            logging.info(f"Mined block successfully! Hash: {mined_block['hash']}")
+            logging.info(f"Mining took: {total_time:.2f} seconds")
+            save_block_data(mined_block, f"block_{block_data['block_number']}.json")
+            add_block_to_chain(mined_block)
+            mining_info["last_block"] = mined_block
+
+            # Halving the reward every HALVING_INTERVAL blocks
+            if len(CHAIN) % HALVING_INTERVAL == 0:
+                REWARD /= 2
+                logging.info(f"Block reward halved! New reward: {REWARD} units")
+
+            # Adjust difficulty for the next block
+            difficulty_adjustment = retarget_difficulty()
+            if difficulty_adjustment == 1:
+                logging.info("Increasing difficulty for the next block")
+            elif difficulty_adjustment == -1:
+                logging.info("Decreasing difficulty for the next block")
+            else:
+                logging.info("Difficulty remains unchanged for the next block")
+        else:
+            logging.error(f"Failed to mine block {block_data['block_number']}")
+            mining_info["error"] = f"Failed to mine block {block_data['block_number']}"
+    except Exception as e:
+        logging.exception(f"Mining block {block_data['block_number']} failed")
+        mining_info["error"] = f"Mining block {block_data['block_number']} failed: {e!r}"
+    finally:
+        mining_info["status"] = "idle"
+        MINING_LOCK.release()
+
 @app.route('/mine', methods=['POST'])
 def start_mining():
     """
     Endpoint to start mining a new block.
-    """
-    global REWARD  # Declare global REWARD at the beginning of the function
 
+    Mining runs in the background; the response only confirms the job was accepted. Poll /status to follow
+    it; the mined block is published there as "last_block", and a failed job as "error".
+    """
     data = request.json
     difficulty = data.get('difficulty', 'Medium')
     num_workers = data.get('num_workers', None)
+    transactions = data.get('transactions', "Example transaction")
+    target_difficulty = DIFFICULTIES[difficulty]
+
+    # Reject bad input here, while the client is still waiting for a response.
+    if num_workers is not None and (not isinstance(num_workers, int) or isinstance(num_workers, bool) or num_workers < 1):
+        return jsonify({"error": "num_workers must be a positive integer"}), 400
+
+    # One block at a time: the next block depends on the hash of this one.
+    if not MINING_LOCK.acquire(blocking=False):
+        return jsonify({"error": "Already mining a block"}), 409
+
     block_number = len(CHAIN) + 1
     previous_hash = CHAIN[-1]['hash'] if CHAIN else '0' * 64
-    transactions = data.get('transactions', "Example transaction")
 
     block_data = {
         "block_number": block_number,
@@ -185,44 +513,15 @@ def start_mining():
         "previous_hash": previous_hash,
     }
 
-    target_difficulty = DIFFICULTIES[difficulty]
     mining_info.update({
         "status": "mining",
         "current_block": block_number,
-        "difficulty": difficulty
+        "difficulty": difficulty,
+        "error": None,
     })
-    
-    start_time = time.time()
-    mined_block = mine(block_data, target_difficulty, num_workers)
+    MINING_EXECUTOR.submit(mine_next_block, block_data, target_difficulty, num_workers)
 
-    if mined_block:
-        total_time = time.time() - start_time
-        mined_block['mining_time'] = total_time
-        mined_block['reward'] = REWARD
-        logging.info(f"Mined block successfully! Hash: {mined_block['hash']}")
-        logging.info(f"Mining took: {total_time:.2f} seconds")
-        save_block_data(mined_block, f"block_{block_number}.json")
-        add_block_to_chain(mined_block)
-
-        # Halving the reward every HALVING_INTERVAL blocks
-        if len(CHAIN) % HALVING_INTERVAL == 0:
-            REWARD /= 2
-            logging.info(f"Block reward halved! New reward: {REWARD} units")
-
-        # Adjust difficulty for the next block
-        difficulty_adjustment = retarget_difficulty()
-        if difficulty_adjustment == 1:
-            logging.info("Increasing difficulty for the next block")
-        elif difficulty_adjustment == -1:
-            logging.info("Decreasing difficulty for the next block")
-        else:
-            logging.info("Difficulty remains unchanged for the next block")
-
-        mining_info["status"] = "idle"
-        return jsonify(mined_block), 200
-    else:
-        mining_info["status"] = "idle"
-        return jsonify({"error": "Failed to mine the block"}), 500
+    return jsonify({"status": "mining", "block_number": block_number}), 202
 
 if __name__ == '__main__':
     args = parse_args()
@@ -255,5 +554,6 @@ if __name__ == '__main__':
         max_attempts = 2 ** (256 - target_difficulty)
         logging.warning(f"Couldn't find a valid hash within {max_attempts} attempts.")
 
-    # Start the Flask web server for monitoring
-    app.run(host='0.0.0.0', port=5000)
+    # Start the Flask web server for monitoring. For anything beyond local use, serve `Main:app` with a
+    # production WSGI server instead (see the README).
+    app.run(host='0.0.0.0', port=5000, threaded=True)
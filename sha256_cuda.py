@@ -0,0 +1,197 @@
+"""
+CUDA SHA-256 nonce scanner, run through CuPy.
+
+Used by Main.py when CuPy is installed and a CUDA device is present. Importing this module raises ImportError if
+CuPy is missing.
+"""
+import random
+from hashlib import sha256
+
+import cupy as cp
+import numpy as np
+
+K = (
+    0x428a2f98, 0x71374491, 0xb5c0fbcf, 0xe9b5dba5, 0x3956c25b, 0x59f111f1, 0x923f82a4, 0xab1c5ed5,
+    0xd807aa98, 0x12835b01, 0x243185be, 0x550c7dc3, 0x72be5d74, 0x80deb1fe, 0x9bdc06a7, 0xc19bf174,
+    0xe49b69c1, 0xefbe4786, 0x0fc19dc6, 0x240ca1cc, 0x2de92c6f, 0x4a7484aa, 0x5cb0a9dc, 0x76f988da,
+    0x983e5152, 0xa831c66d, 0xb00327c8, 0xbf597fc7, 0xc6e00bf3, 0xd5a79147, 0x06ca6351, 0x14292967,
+    0x27b70a85, 0x2e1b2138, 0x4d2c6dfc, 0x53380d13, 0x650a7354, 0x766a0abb, 0x81c2c92e, 0x92722c85,
+    0xa2bfe8a1, 0xa81a664b, 0xc24b8b70, 0xc76c51a3, 0xd192e819, 0xd6990624, 0xf40e3585, 0x106aa070,
+    0x19a4c116, 0x1e376c08, 0x2748774c, 0x34b0bcb5, 0x391c0cb3, 0x4ed8aa4a, 0x5b9cca4f, 0x682e6ff3,
+    0x748f82ee, 0x78a5636f, 0x84c87814, 0x8cc70208, 0x90befffa, 0xa4506ceb, 0xbef9a3f7, 0xc67178f2,
+)
+
+H0 = (0x6a09e667, 0xbb67ae85, 0x3c6ef372, 0xa54ff53a, 0x510e527f, 0x9b05688c, 0x1f83d9ab, 0x5be0cd19)
+
+SOURCE = r'''
+#define MAX_TAIL 256
+
+__constant__ unsigned int K[64] = {K_VALUES};
+
+#define ROTR(x, n) (((x) >> (n)) | ((x) << (32 - (n))))
+
+__device__ void compress(unsigned int state[8], const unsigned char *data)
+{
+    unsigned int w[64];
+
+#pragma unroll
+    for (int t = 0; t < 16; t++)
+        w[t] = ((unsigned int)data[4 * t] << 24) | ((unsigned int)data[4 * t + 1] << 16)
+             | ((unsigned int)data[4 * t + 2] << 8) | data[4 * t + 3];
+#pragma unroll
+    for (int t = 16; t < 64; t++) {
+        unsigned int s0 = ROTR(w[t - 15], 7) ^ ROTR(w[t - 15], 18) ^ (w[t - 15] >> 3);
+        unsigned int s1 = ROTR(w[t - 2], 17) ^ ROTR(w[t - 2], 19) ^ (w[t - 2] >> 10);
+        w[t] = w[t - 16] + s0 + w[t - 7] + s1;
+    }
+
+    unsigned int a = state[0], b = state[1], c = state[2], d = state[3];
+    unsigned int e = state[4], f = state[5], g = state[6], h = state[7];
+#pragma unroll
+    for (int t = 0; t < 64; t++) {
+        unsigned int t1 = h + (ROTR(e, 6) ^ ROTR(e, 11) ^ ROTR(e, 25)) + ((e & f) ^ (~e & g)) + K[t] + w[t];
+        unsigned int t2 = (ROTR(a, 2) ^ ROTR(a, 13) ^ ROTR(a, 22)) + ((a & b) ^ (a & c) ^ (b & c));
+        h = g; g = f; f = e; e = d + t1;
+        d = c; c = b; b = a; a = t1 + t2;
+    }
+
+    state[0] += a; state[1] += b; state[2] += c; state[3] += d;
+    state[4] += e; state[5] += f; state[6] += g; state[7] += h;
+}
+
+/*
+ * One thread per nonce. The midstate over the whole 64-byte blocks of the
+ * prefix is computed once on the host; every thread hashes its own tail (the
+ * rest of the prefix, its nonce digits and the suffix) from there. The
+ * smallest nonce whose top 64 digest bits are <= target_hi is kept in *found.
+ */
+extern "C" __global__
+void sha256_scan(const unsigned int *midstate, const unsigned char *head, unsigned int prefix_len,
+                 const unsigned char *suffix, unsigned int suffix_len,
+                 unsigned long long nonce_base, unsigned long long nonce_end,
+                 unsigned long long target_hi, unsigned long long *found)
+{
+    unsigned int head_len = prefix_len % 64;
+    unsigned long long nonce = nonce_base + (unsigned long long)blockIdx.x * blockDim.x + threadIdx.x;
+    if (nonce >= nonce_end)
+        return;
+
+    unsigned char tail[MAX_TAIL];
+    unsigned char digits[20];
+    unsigned int ndigits = 0, len = head_len;
+    unsigned long long n = nonce;
+
+    do {
+        digits[ndigits++] = '0' + n % 10;
+        n /= 10;
+    } while (n > 0);
+
+    for (unsigned int i = 0; i < head_len; i++)
+        tail[i] = head[i];
+    while (ndigits > 0)
+        tail[len++] = digits[--ndigits];
+    for (unsigned int i = 0; i < suffix_len; i++)
+        tail[len++] = suffix[i];
+
+    unsigned long long bits = (unsigned long long)(prefix_len - head_len + len) * 8;
+    unsigned int blocks = (len + 9 + 63) / 64;
+    tail[len++] = 0x80;
+    while (len < blocks * 64 - 8)
+        tail[len++] = 0;
+    for (int i = 7; i >= 0; i--)
+        tail[len++] = (unsigned char)(bits >> (8 * i));
+
+    unsigned int state[8];
+    for (int i = 0; i < 8; i++)
+        state[i] = midstate[i];
+    for (unsigned int i = 0; i < blocks; i++)
+        compress(state, tail + 64 * i);
+
+    unsigned long long hi = ((unsigned long long)state[0] << 32) | state[1];
+    if (hi <= target_hi)
+        atomicMin(found, nonce);
+}
+'''
+
+KERNEL = cp.RawKernel(SOURCE.replace("K_VALUES", ", ".join(map(hex, K))), "sha256_scan")
+THREADS_PER_BLOCK = 256
+WINDOW = 1 << 24  # Nonces per kernel launch
+MAX_SUFFIX = 256 - 63 - 20 - 9  # Room left in the kernel's tail buffer
+NOT_FOUND = 2 ** 64 - 1
+
+def rotr(x, n):
+    return ((x >> n) | (x << (32 - n))) & 0xFFFFFFFF
+
+def midstate(prefix):
+    """
+    Returns the SHA-256 state after the whole 64-byte blocks of prefix, as a uint32 array for the kernel.
+    """
+    state = list(H0)
+    for offset in range(0, len(prefix) - len(prefix) % 64, 64):
+        w = [int.from_bytes(prefix[offset + 4 * t:offset + 4 * t + 4], 'big') for t in range(16)]
+        for t in range(16, 64):
+            s0 = rotr(w[t - 15], 7) ^ rotr(w[t - 15], 18) ^ (w[t - 15] >> 3)
+            s1 = rotr(w[t - 2], 17) ^ rotr(w[t - 2], 19) ^ (w[t - 2] >> 10)
+            w.append((w[t - 16] + s0 + w[t - 7] + s1) & 0xFFFFFFFF)
+
+        a, b, c, d, e, f, g, h = state
+        for t in range(64):
+            t1 = h + (rotr(e, 6) ^ rotr(e, 11) ^ rotr(e, 25)) + ((e & f) ^ (~e & g)) + K[t] + w[t]
+            t2 = (rotr(a, 2) ^ rotr(a, 13) ^ rotr(a, 22)) + ((a & b) ^ (a & c) ^ (b & c))
+            a, b, c, d, e, f, g, h = (t1 + t2) & 0xFFFFFFFF, a, b, c, (d + t1) & 0xFFFFFFFF, e, f, g
+        state = [(x + y) & 0xFFFFFFFF for x, y in zip(state, (a, b, c, d, e, f, g, h))]
+    return np.array(state, dtype=np.uint32)
+
+def available():
+    """
+    Returns True if there is a CUDA device to run the kernel on.
+    """
+    try:
+        return cp.cuda.runtime.getDeviceCount() > 0
+    except cp.cuda.runtime.CUDARuntimeError:
+        return False
+
+def self_check():
+    """
+    Runs the kernel over a few small nonce ranges and returns True if it picks the same nonces as hashlib.
+
+    The prefixes cover zero, one and two whole blocks, and the ranges cross a change in digit count.
+    """
+    rng = random.Random(0)
+    for prefix_len, suffix_len, nonce_start in ((0, 1, 0), (60, 30, 95), (100, 1, 9990), (168, 1, 10 ** 12 - 500)):
+        prefix, suffix = rng.randbytes(prefix_len), rng.randbytes(suffix_len)
+        target_hi = 2 ** 64 >> 6
+        expected = next((nonce for nonce in range(nonce_start, nonce_start + 1000)
+                         if int.from_bytes(sha256(prefix + b'%d' % nonce + suffix).digest()[:8], 'big') <= target_hi),
+                        None)
+        if scan(prefix, suffix, nonce_start, nonce_start + 1000, target_hi) != expected:
+            return False
+    return True
+
+def scan(prefix, suffix, nonce_start, nonce_end, target_hi):
+    """
+    Hashes prefix + decimal(nonce) + suffix on the GPU for each nonce in [nonce_start, nonce_end) and returns the
+    first nonce whose top 64 digest bits are <= target_hi, or None if there is none.
+    """
+    if len(suffix) > MAX_SUFFIX:
+        raise ValueError(f"suffix is {len(suffix)} bytes, the kernel supports at most {MAX_SUFFIX}")
+
+    d_midstate = cp.asarray(midstate(prefix))
+    d_head = cp.asarray(np.frombuffer(prefix[len(prefix) - len(prefix) % 64:], dtype=np.uint8))
+    d_suffix = cp.asarray(np.frombuffer(suffix, dtype=np.uint8))
+    found = cp.empty(1, dtype=cp.uint64)
+
+    for base in range(nonce_start, nonce_end, WINDOW):
+        end = min(base + WINDOW, nonce_end)
+        found.fill(NOT_FOUND)
+        blocks = (end - base + THREADS_PER_BLOCK - 1) // THREADS_PER_BLOCK
+        KERNEL((blocks,), (THREADS_PER_BLOCK,), (
+            d_midstate, d_head, np.uint32(len(prefix)),
+            d_suffix, np.uint32(len(suffix)),
+            np.uint64(base), np.uint64(end),
+            np.uint64(target_hi), found,
+        ))
+        nonce = int(found.get()[0])
+        if nonce != NOT_FOUND:
+            return nonce
+    return None
@@ -0,0 +1,130 @@
+"""
+Numba-compiled SHA-256 nonce scanner.
+
+Used by Main.py when numba is installed and the native scanner from sha256_scan.c hasn't been built.
+Importing this module raises ImportError if numba (or numpy) is missing.
+"""
+import numpy as np
+from numba import njit
+
+K = np.array([
+    0x428a2f98, 0x71374491, 0xb5c0fbcf, 0xe9b5dba5, 0x3956c25b, 0x59f111f1, 0x923f82a4, 0xab1c5ed5,
+    0xd807aa98, 0x12835b01, 0x243185be, 0x550c7dc3, 0x72be5d74, 0x80deb1fe, 0x9bdc06a7, 0xc19bf174,
+    0xe49b69c1, 0xefbe4786, 0x0fc19dc6, 0x240ca1cc, 0x2de92c6f, 0x4a7484aa, 0x5cb0a9dc, 0x76f988da,
+    0x983e5152, 0xa831c66d, 0xb00327c8, 0xbf597fc7, 0xc6e00bf3, 0xd5a79147, 0x06ca6351, 0x14292967,
+    0x27b70a85, 0x2e1b2138, 0x4d2c6dfc, 0x53380d13, 0x650a7354, 0x766a0abb, 0x81c2c92e, 0x92722c85,
+    0xa2bfe8a1, 0xa81a664b, 0xc24b8b70, 0xc76c51a3, 0xd192e819, 0xd6990624, 0xf40e3585, 0x106aa070,
+    0x19a4c116, 0x1e376c08, 0x2748774c, 0x34b0bcb5, 0x391c0cb3, 0x4ed8aa4a, 0x5b9cca4f, 0x682e6ff3,
+    0x748f82ee, 0x78a5636f, 0x84c87814, 0x8cc70208, 0x90befffa, 0xa4506ceb, 0xbef9a3f7, 0xc67178f2,
+], dtype=np.uint32)
+
+H0 = np.array([
+    0x6a09e667, 0xbb67ae85, 0x3c6ef372, 0xa54ff53a, 0x510e527f, 0x9b05688c, 0x1f83d9ab, 0x5be0cd19,
+], dtype=np.uint32)
+
+@njit(inline="always")
+def rotr(x, n):
+    return np.uint32((x >> np.uint32(n)) | (x << np.uint32(32 - n)))
+
+@njit(cache=True, boundscheck=False)
+def sha256_compress(state, data, offset, w):
+    """
+    Compresses the 64-byte block at data[offset:offset + 64] into state.
+
+    numba widens uint32 arithmetic, so each result is cast back to np.uint32, which wraps it without masking.
+    """
+    for t in range(16):
+        i = offset + 4 * t
+        w[t] = (np.uint32(data[i]) << 24) | (np.uint32(data[i + 1]) << 16) | (np.uint32(data[i + 2]) << 8) | data[i + 3]
+    for t in range(16, 64):
+        x = w[t - 15]
+        y = w[t - 2]
+        s0 = rotr(x, 7) ^ rotr(x, 18) ^ (x >> np.uint32(3))
+        s1 = rotr(y, 17) ^ rotr(y, 19) ^ (y >> np.uint32(10))
+        w[t] = np.uint32(w[t - 16] + s0 + w[t - 7] + s1)
+
+    a = state[0]
+    b = state[1]
+    c = state[2]
+    d = state[3]
+    e = state[4]
+    f = state[5]
+    g = state[6]
+    h = state[7]
+    for t in range(64):
+        t1 = np.uint32(h + (rotr(e, 6) ^ rotr(e, 11) ^ rotr(e, 25)) + ((e & f) ^ (~e & g)) + K[t] + w[t])
+        t2 = np.uint32((rotr(a, 2) ^ rotr(a, 13) ^ rotr(a, 22)) + ((a & b) ^ (a & c) ^ (b & c)))
+        h = g
+        g = f
+        f = e
+        e = np.uint32(d + t1)
+        d = c
+        c = b
+        b = a
+        a = np.uint32(t1 + t2)
+
+    state[0] += a
+    state[1] += b
+    state[2] += c
+    state[3] += d
+    state[4] += e
+    state[5] += f
+    state[6] += g
+    state[7] += h
+
+@njit(cache=True, boundscheck=False)
+def scan(prefix, suffix, nonce_start, nonce_end, target_hi):
+    """
+    Hashes prefix + decimal(nonce) + suffix for each nonce in [nonce_start, nonce_end) and returns the first
+    nonce whose top 64 digest bits are <= target_hi, or -1 if there is none.
+
+    The tail (the rest of the prefix, the digits, the suffix and the padding) is laid out once per digit count;
+    each nonce then only rewrites its digits.
+    """
+    w = np.empty(64, dtype=np.uint32)
+    midstate = H0.copy()
+    full = len(prefix) // 64
+    for block in range(full):
+        sha256_compress(midstate, prefix, block * 64, w)
+
+    head = len(prefix) - full * 64
+    tail = np.zeros((head + 20 + len(suffix) + 9 + 63) // 64 * 64, dtype=np.uint8)
+    tail[:head] = prefix[full * 64:]
+    state = np.empty(8, dtype=np.uint32)
+    ndigits = 0
+    blocks = 0
+    bound = 0
+
+    for nonce in range(nonce_start, nonce_end):
+        if nonce >= bound:
+            # The digit count changed: move the suffix and rewrite the padding and length field
+            ndigits = 1
+            bound = 10
+            while nonce >= bound and ndigits < 18:
+                ndigits += 1
+                bound *= 10
+            if nonce >= bound:
+                ndigits = 19
+                bound = nonce_end
+            length = head + ndigits + len(suffix)
+            blocks = (length + 9 + 63) // 64
+            tail[head + ndigits:length] = suffix
+            tail[length] = 0x80
+            tail[length + 1:] = 0
+            bits = (full * 64 + length) * 8
+            for i in range(8):
+                tail[blocks * 64 - 1 - i] = (bits >> (8 * i)) & 0xFF
+
+        n = nonce
+        for i in range(head + ndigits - 1, head - 1, -1):
+            tail[i] = 48 + n % 10
+            n //= 10
+
+        state[:] = midstate
+        for block in range(blocks):
+            sha256_compress(state, tail, block * 64, w)
+
+        hi = (np.uint64(state[0]) << np.uint64(32)) | np.uint64(state[1])
+        if hi <= target_hi:
+            return nonce
+    return -1
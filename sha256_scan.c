@@ -0,0 +1,286 @@
+/*
+ * Native SHA-256 nonce scanner for Main.py, loaded through ctypes.
+ *
+ * Build it next to Main.py with:
+ *
+ *     cc -O3 -march=native -shared -fPIC -o libsha256_scan.so sha256_scan.c
+ *
+ * Every nonce is an independent message, so nonces are hashed LANES at a
+ * time with the message words laid out lane by lane. The compiler turns the
+ * per-lane loops into AVX2/AVX-512 (or NEON) instructions, giving a
+ * multi-buffer SHA-256. On x86-64 CPUs with the SHA extensions, the SHA-NI
+ * compression is used instead, one message at a time. Define
+ * SHA256_SCAN_NO_SHANI to always use the multi-buffer path.
+ */
+#include <stdint.h>
+#include <stdlib.h>
+#include <string.h>
+
+#if defined(__x86_64__) && (defined(__GNUC__) || defined(__clang__)) && !defined(SHA256_SCAN_NO_SHANI)
+#define HAVE_SHANI 1
+#include <immintrin.h>
+#endif
+
+#define LANES 8
+
+static const uint32_t K[64] = {
+    0x428a2f98, 0x71374491, 0xb5c0fbcf, 0xe9b5dba5, 0x3956c25b, 0x59f111f1, 0x923f82a4, 0xab1c5ed5,
+    0xd807aa98, 0x12835b01, 0x243185be, 0x550c7dc3, 0x72be5d74, 0x80deb1fe, 0x9bdc06a7, 0xc19bf174,
+    0xe49b69c1, 0xefbe4786, 0x0fc19dc6, 0x240ca1cc, 0x2de92c6f, 0x4a7484aa, 0x5cb0a9dc, 0x76f988da,
+    0x983e5152, 0xa831c66d, 0xb00327c8, 0xbf597fc7, 0xc6e00bf3, 0xd5a79147, 0x06ca6351, 0x14292967,
+    0x27b70a85, 0x2e1b2138, 0x4d2c6dfc, 0x53380d13, 0x650a7354, 0x766a0abb, 0x81c2c92e, 0x92722c85,
+    0xa2bfe8a1, 0xa81a664b, 0xc24b8b70, 0xc76c51a3, 0xd192e819, 0xd6990624, 0xf40e3585, 0x106aa070,
+    0x19a4c116, 0x1e376c08, 0x2748774c, 0x34b0bcb5, 0x391c0cb3, 0x4ed8aa4a, 0x5b9cca4f, 0x682e6ff3,
+    0x748f82ee, 0x78a5636f, 0x84c87814, 0x8cc70208, 0x90befffa, 0xa4506ceb, 0xbef9a3f7, 0xc67178f2,
+};
+
+static const uint32_t H0[8] = {
+    0x6a09e667, 0xbb67ae85, 0x3c6ef372, 0xa54ff53a, 0x510e527f, 0x9b05688c, 0x1f83d9ab, 0x5be0cd19,
+};
+
+#define ROTR(x, n) (((x) >> (n)) | ((x) << (32 - (n))))
+#define CH(x, y, z) (((x) & (y)) ^ (~(x) & (z)))
+#define MAJ(x, y, z) (((x) & (y)) ^ ((x) & (z)) ^ ((y) & (z)))
+#define BSIG0(x) (ROTR(x, 2) ^ ROTR(x, 13) ^ ROTR(x, 22))
+#define BSIG1(x) (ROTR(x, 6) ^ ROTR(x, 11) ^ ROTR(x, 25))
+#define SSIG0(x) (ROTR(x, 7) ^ ROTR(x, 18) ^ ((x) >> 3))
+#define SSIG1(x) (ROTR(x, 17) ^ ROTR(x, 19) ^ ((x) >> 10))
+
+static inline uint32_t load_be32(const uint8_t *p)
+{
+    return ((uint32_t)p[0] << 24) | ((uint32_t)p[1] << 16) | ((uint32_t)p[2] << 8) | p[3];
+}
+
+/* Compresses `blocks` consecutive 64-byte blocks into `state`. */
+static void compress_scalar(uint32_t state[8], const uint8_t *data, size_t blocks)
+{
+    uint32_t w[64];
+
+    for (; blocks > 0; blocks--, data += 64) {
+        uint32_t a = state[0], b = state[1], c = state[2], d = state[3];
+        uint32_t e = state[4], f = state[5], g = state[6], h = state[7];
+
+        for (int t = 0; t < 16; t++)
+            w[t] = load_be32(data + 4 * t);
+        for (int t = 16; t < 64; t++)
+            w[t] = SSIG1(w[t - 2]) + w[t - 7] + SSIG0(w[t - 15]) + w[t - 16];
+
+        for (int t = 0; t < 64; t++) {
+            uint32_t t1 = h + BSIG1(e) + CH(e, f, g) + K[t] + w[t];
+            uint32_t t2 = BSIG0(a) + MAJ(a, b, c);
+            h = g; g = f; f = e; e = d + t1;
+            d = c; c = b; b = a; a = t1 + t2;
+        }
+
+        state[0] += a; state[1] += b; state[2] += c; state[3] += d;
+        state[4] += e; state[5] += f; state[6] += g; state[7] += h;
+    }
+}
+
+/*
+ * Compresses one 64-byte block per lane. state[i][l] is word i of lane l, so
+ * each inner loop runs the same operation across all lanes.
+ */
+static void compress_lanes(uint32_t state[8][LANES], const uint8_t *blocks[LANES])
+{
+    uint32_t w[64][LANES];
+    uint32_t v[8][LANES];
+
+    for (int t = 0; t < 16; t++)
+        for (int l = 0; l < LANES; l++)
+            w[t][l] = load_be32(blocks[l] + 4 * t);
+    for (int t = 16; t < 64; t++)
+        for (int l = 0; l < LANES; l++)
+            w[t][l] = SSIG1(w[t - 2][l]) + w[t - 7][l] + SSIG0(w[t - 15][l]) + w[t - 16][l];
+
+    memcpy(v, state, sizeof(v));
+    for (int t = 0; t < 64; t++) {
+        for (int l = 0; l < LANES; l++) {
+            uint32_t t1 = v[7][l] + BSIG1(v[4][l]) + CH(v[4][l], v[5][l], v[6][l]) + K[t] + w[t][l];
+            uint32_t t2 = BSIG0(v[0][l]) + MAJ(v[0][l], v[1][l], v[2][l]);
+            v[7][l] = v[6][l]; v[6][l] = v[5][l]; v[5][l] = v[4][l]; v[4][l] = v[3][l] + t1;
+            v[3][l] = v[2][l]; v[2][l] = v[1][l]; v[1][l] = v[0][l]; v[0][l] = t1 + t2;
+        }
+    }
+
+    for (int i = 0; i < 8; i++)
+        for (int l = 0; l < LANES; l++)
+            state[i][l] += v[i][l];
+}
+
+#ifdef HAVE_SHANI
+/* Same as compress_scalar, using the Intel SHA extensions. */
+__attribute__((target("sha,sse4.1")))
+static void compress_shani(uint32_t state[8], const uint8_t *data, size_t blocks)
+{
+    const __m128i mask = _mm_set_epi64x(0x0c0d0e0f08090a0bULL, 0x0405060700010203ULL);
+    __m128i state0, state1, tmp, msg, m[4];
+
+#ifdef __AVX__
+    /*
+     * The SHA instructions only have legacy SSE encodings. Clear the upper
+     * halves of the vector registers first, or every one of them pays an
+     * AVX/SSE transition penalty on some CPUs.
+     */
+    _mm256_zeroupper();
+#endif
+
+    /* Rearrange the state into the ABEF/CDGH layout sha256rnds2 expects. */
+    tmp = _mm_loadu_si128((const __m128i *)&state[0]);
+    state1 = _mm_loadu_si128((const __m128i *)&state[4]);
+    tmp = _mm_shuffle_epi32(tmp, 0xB1);
+    state1 = _mm_shuffle_epi32(state1, 0x1B);
+    state0 = _mm_alignr_epi8(tmp, state1, 8);
+    state1 = _mm_blend_epi16(state1, tmp, 0xF0);
+
+    for (; blocks > 0; blocks--, data += 64) {
+        __m128i abef = state0, cdgh = state1;
+
+        for (int g = 0; g < 16; g++) {
+            if (g < 4) {
+                m[g] = _mm_shuffle_epi8(_mm_loadu_si128((const __m128i *)(data + 16 * g)), mask);
+            } else {
+                /* m[g & 3] holds W[4g-16..4g-13] and becomes W[4g..4g+3]. */
+                tmp = _mm_sha256msg1_epu32(m[g & 3], m[(g + 1) & 3]);
+                tmp = _mm_add_epi32(tmp, _mm_alignr_epi8(m[(g + 3) & 3], m[(g + 2) & 3], 4));
+                m[g & 3] = _mm_sha256msg2_epu32(tmp, m[(g + 3) & 3]);
+            }
+            msg = _mm_add_epi32(m[g & 3], _mm_loadu_si128((const __m128i *)&K[4 * g]));
+            state1 = _mm_sha256rnds2_epu32(state1, state0, msg);
+            msg = _mm_shuffle_epi32(msg, 0x0E);
+            state0 = _mm_sha256rnds2_epu32(state0, state1, msg);
+        }
+
+        state0 = _mm_add_epi32(state0, abef);
+        state1 = _mm_add_epi32(state1, cdgh);
+    }
+
+    tmp = _mm_shuffle_epi32(state0, 0x1B);
+    state1 = _mm_shuffle_epi32(state1, 0xB1);
+    state0 = _mm_blend_epi16(tmp, state1, 0xF0);
+    state1 = _mm_alignr_epi8(state1, tmp, 8);
+    _mm_storeu_si128((__m128i *)&state[0], state0);
+    _mm_storeu_si128((__m128i *)&state[4], state1);
+}
+#endif
+
+/*
+ * Writes the padded final block(s) for `nonce` into `tail` and returns how
+ * many 64-byte blocks they take. `head` holds the prefix bytes that did not
+ * fill a whole block and were left out of the midstate.
+ */
+static size_t build_tail(uint8_t *tail, const uint8_t *head, size_t head_len,
+                         uint64_t nonce, const uint8_t *suffix, size_t suffix_len,
+                         size_t prefix_len)
+{
+    char digits[20];
+    size_t ndigits = 0, len = head_len, blocks;
+    uint64_t bits;
+
+    do {
+        digits[ndigits++] = (char)('0' + nonce % 10);
+        nonce /= 10;
+    } while (nonce > 0);
+
+    memcpy(tail, head, head_len);
+    while (ndigits > 0)
+        tail[len++] = (uint8_t)digits[--ndigits];
+    memcpy(tail + len, suffix, suffix_len);
+    len += suffix_len;
+
+    bits = (uint64_t)(prefix_len + len - head_len) * 8;
+    blocks = (len + 9 + 63) / 64;
+    tail[len++] = 0x80;
+    memset(tail + len, 0, blocks * 64 - len);
+    for (int i = 0; i < 8; i++)
+        tail[blocks * 64 - 1 - i] = (uint8_t)(bits >> (8 * i));
+    return blocks;
+}
+
+/*
+ * Hashes prefix || decimal(nonce) || suffix for every nonce in
+ * [nonce_start, nonce_end) and stops at the first one whose digest, read as
+ * a big-endian integer, has its top 64 bits <= target_hi. That nonce is a
+ * candidate only; the caller checks the full digest against the target.
+ *
+ * Returns 1 and stores the nonce in *nonce_out on a candidate, 0 if the
+ * range is exhausted and -1 if memory could not be allocated.
+ */
+int sha256_scan(const uint8_t *prefix, size_t prefix_len,
+                const uint8_t *suffix, size_t suffix_len,
+                uint64_t nonce_start, uint64_t nonce_end,
+                uint64_t target_hi, uint64_t *nonce_out)
+{
+    uint32_t midstate[8];
+    size_t full = prefix_len / 64, head_len = prefix_len % 64;
+    const uint8_t *head = prefix + full * 64;
+    size_t tail_size = (head_len + 20 + suffix_len + 9 + 63) / 64 * 64;
+    uint8_t *tails = malloc(tail_size * LANES);
+    int use_shani = 0;
+    uint64_t nonce = nonce_start;
+
+    if (tails == NULL)
+        return -1;
+
+    memcpy(midstate, H0, sizeof(midstate));
+    compress_scalar(midstate, prefix, full);
+
+#ifdef HAVE_SHANI
+    __builtin_cpu_init();
+    use_shani = __builtin_cpu_supports("sha") && __builtin_cpu_supports("sse4.1");
+#endif
+
+    while (nonce < nonce_end) {
+        uint64_t count = nonce_end - nonce < LANES ? nonce_end - nonce : LANES;
+        size_t blocks[LANES];
+        uint32_t out[8][LANES];
+        int same_length = count == LANES;
+
+        for (uint64_t l = 0; l < count; l++) {
+            blocks[l] = build_tail(tails + l * tail_size, head, head_len, nonce + l,
+                                   suffix, suffix_len, prefix_len);
+            same_length = same_length && blocks[l] == blocks[0];
+        }
+
+        if (same_length && !use_shani) {
+            const uint8_t *ptrs[LANES];
+
+            for (int i = 0; i < 8; i++)
+                for (int l = 0; l < LANES; l++)
+                    out[i][l] = midstate[i];
+            for (size_t b = 0; b < blocks[0]; b++) {
+                for (int l = 0; l < LANES; l++)
+                    ptrs[l] = tails + l * tail_size + b * 64;
+                compress_lanes(out, ptrs);
+            }
+        } else {
+            for (uint64_t l = 0; l < count; l++) {
+                uint32_t state[8];
+
+                memcpy(state, midstate, sizeof(state));
+#ifdef HAVE_SHANI
+                if (use_shani)
+                    compress_shani(state, tails + l * tail_size, blocks[l]);
+                else
+#endif
+                    compress_scalar(state, tails + l * tail_size, blocks[l]);
+                for (int i = 0; i < 8; i++)
+                    out[i][l] = state[i];
+            }
+        }
+
+        for (uint64_t l = 0; l < count; l++) {
+            uint64_t hi = ((uint64_t)out[0][l] << 32) | out[1][l];
+
+            if (hi <= target_hi) {
+                *nonce_out = nonce + l;
+                free(tails);
+                return 1;
+            }
+        }
+        nonce += count;
+    }
+
+    free(tails);
+    return 0;
+}